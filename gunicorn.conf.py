@@ -0,0 +1,13 @@
+"""
+Gunicorn configuration for production serving (Render etc.).
+
+Gevent workers monkey-patch sockets, so the blocking yfinance and Gemini
+HTTP calls yield the worker to other requests instead of serializing them
+the way the Flask dev server does.
+"""
+import os
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "5001")
+worker_class = "gevent"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+worker_connections = 200
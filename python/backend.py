@@ -1,5 +1,14 @@
+import base64
+import io
 import os
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from flask import Flask, render_template, request, jsonify, redirect
+import requests
+from requests.adapters import HTTPAdapter
 import yfinance as yf
 import pandas as pd
 import numpy as np
@@ -25,6 +34,15 @@ except ImportError:
     firestore = None
     print("Warning: firebase-admin not available, Firebase features disabled")
 
+# orjson (faster JSON serialization)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+    print("Warning: orjson not available, using stdlib json for responses")
+
 # Gemini AI
 try:
     import google.generativeai as genai
@@ -41,7 +59,8 @@ try:
     calculate_sma,
     calculate_ema,
     calculate_rsi,
-    find_support_resistance
+    find_support_resistance,
+    compute_all
 )
 
 except ImportError as e:
@@ -72,9 +91,11 @@ if FIREBASE_AVAILABLE:
 
 # Initialize Gemini AI
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = None
 if GEMINI_AVAILABLE and GEMINI_API_KEY:
     try:
         genai.configure(api_key=GEMINI_API_KEY)
+        GEMINI_MODEL = genai.GenerativeModel("gemini-2.5-flash")
         print("Gemini AI configured successfully")
     except Exception as e:
         print(f"Warning: Could not configure Gemini AI: {e}")
@@ -84,6 +105,16 @@ app = Flask(__name__, template_folder='templates')
 if CORS_AVAILABLE:
     CORS(app)
 
+def ojsonify(obj):
+    """jsonify replacement serializing with orjson when it is installed."""
+    if not ORJSON_AVAILABLE:
+        return jsonify(obj)
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype='application/json'
+    )
+
+
 @app.errorhandler(500)
 def internal_error(error):
     print(f"500 Error: {error}")
@@ -95,68 +126,278 @@ def internal_error(error):
         return "Internal Server Error", 500
 
 
+# In-process cache for yfinance downloads. Repeat analyses of the same
+# (symbol, date range) within the TTL skip the network round-trip entirely;
+# a short TTL keeps late-day bars reasonably fresh.
+YF_CACHE = {}
+YF_CACHE_TTL = 900  # 15 minutes
+YF_CACHE_MAXSIZE = 256
+
+
+# Persistent session so repeated Yahoo fetches reuse pooled TCP/TLS connections
+# instead of paying a fresh handshake per download.
+YAHOO_SESSION = requests.Session()
+YAHOO_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+YAHOO_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+YAHOO_CSV_URL = "https://query1.finance.yahoo.com/v7/finance/download/{symbol}"
+
+
+def _fetch_csv(symbol, date_from, date_to):
+    """Fetch daily bars straight from Yahoo's CSV endpoint over the pooled session."""
+    def _epoch(date_str):
+        d = _parse_date(date_str)
+        return int(datetime(d.year, d.month, d.day).timestamp())
+
+    params = {
+        "period1": _epoch(date_from),
+        "period2": _epoch(date_to) + 86400,
+        "interval": "1d",
+        "events": "history",
+    }
+    resp = YAHOO_SESSION.get(YAHOO_CSV_URL.format(symbol=symbol), params=params, timeout=10)
+    if resp.status_code != 200 or not resp.text.startswith("Date"):
+        return None
+    data = pd.read_csv(io.StringIO(resp.text), parse_dates=['Date'], index_col='Date')
+    return data if not data.empty else None
+
+
+# Per-symbol history persisted to disk so a date window that merely slides
+# forward only fetches the delta since the last cached bar.
+YF_DISK_CACHE_DIR = os.environ.get("YF_CACHE_DIR", ".yf_cache")
+
+
+def _disk_cache_path(symbol):
+    return os.path.join(YF_DISK_CACHE_DIR, f"{symbol.replace('/', '_')}.parquet")
+
+
+def _load_history(symbol):
+    path = _disk_cache_path(symbol)
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Warning: could not read cached history for {symbol}: {e}")
+    return None
+
+
+def _store_history(symbol, data):
+    try:
+        os.makedirs(YF_DISK_CACHE_DIR, exist_ok=True)
+        data.to_parquet(_disk_cache_path(symbol))
+    except Exception as e:
+        print(f"Warning: could not persist history for {symbol}: {e}")
+
+
+def _download_range(symbol, date_from, date_to):
+    """Network fetch: direct Yahoo CSV first, yf.download as fallback."""
+    data = None
+    try:
+        data = _fetch_csv(symbol, date_from, date_to)
+        if data is None and symbol.endswith('.NS'):
+            data = _fetch_csv(symbol.replace('.NS', ''), date_from, date_to)
+    except Exception as e:
+        print(f"Direct Yahoo fetch failed for {symbol}, falling back to yfinance: {e}")
+        data = None
+
+    if data is None or data.empty:
+        try:
+            data = yf.download(symbol, start=date_from, end=date_to, progress=False, threads=False)
+            if data.empty and symbol.endswith('.NS'):
+                alt_symbol = symbol.replace('.NS', '')
+                print(f"Retrying with symbol: {alt_symbol}")
+                data = yf.download(alt_symbol, start=date_from, end=date_to, progress=False, threads=False)
+        except Exception as e:
+            print(f"ERROR downloading {symbol}: {e}")
+            return None
+    return data
+
+
+def _fetch_incremental(symbol, date_from, date_to):
+    """Serve the window from the on-disk history, fetching only missing bars."""
+    history = _load_history(symbol)
+    if history is None or history.empty:
+        data = _download_range(symbol, date_from, date_to)
+        if data is not None and not data.empty:
+            _store_history(symbol, data)
+        return data
+
+    first_cached = history.index.min().date()
+    last_cached = history.index.max().date()
+
+    if _parse_date(date_from) < first_cached:
+        # Window starts before anything we have; refetch it whole and merge
+        data = _download_range(symbol, date_from, date_to)
+        if data is None or data.empty:
+            return data
+        history = pd.concat([data, history])
+        history = history[~history.index.duplicated(keep='first')].sort_index()
+        _store_history(symbol, history)
+    elif _parse_date(date_to) > last_cached:
+        # Start at the boundary bar itself: if it was cached intraday it is
+        # partial, and the keep='last' dedup below replaces it with fresh data
+        delta_start = last_cached.strftime("%Y-%m-%d")
+        print(f"Fetching delta for {symbol}: {delta_start} to {date_to}")
+        delta = _download_range(symbol, delta_start, date_to)
+        if delta is not None and not delta.empty:
+            history = pd.concat([history, delta])
+            history = history[~history.index.duplicated(keep='last')].sort_index()
+            _store_history(symbol, history)
+
+    return history.loc[date_from:date_to]
+
+
+def fetch_price_data(symbol, date_from, date_to):
+    """Fetch price data, serving repeats from the TTL cache.
+
+    Ranges already covered by the per-symbol disk history are sliced locally;
+    only missing bars go over the network (direct Yahoo CSV with a yf.download
+    fallback).
+    """
+    cache_key = (symbol, date_from, date_to)
+    cached = YF_CACHE.get(cache_key)
+    if cached is not None and time.time() - cached[0] < YF_CACHE_TTL:
+        print(f"Cache hit for {symbol} ({date_from} to {date_to})")
+        return cached[1]
+
+    data = None
+    try:
+        data = _fetch_incremental(symbol, date_from, date_to)
+    except Exception as e:
+        print(f"Warning: incremental history cache failed for {symbol}: {e}")
+        data = None
+    if data is None or data.empty:
+        data = _download_range(symbol, date_from, date_to)
+
+    if data is not None and not data.empty:
+        if len(YF_CACHE) >= YF_CACHE_MAXSIZE:
+            YF_CACHE.clear()
+        YF_CACHE[cache_key] = (time.time(), data)
+    return data
+
+
+# Gemini explanation jobs run off the request thread so /api/analyze can
+# return the numeric indicators without waiting on the LLM. Clients poll
+# /api/explanation/<job_id> for the text.
+EXPLANATION_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+EXPLANATION_JOBS = {}
+EXPLANATION_JOBS_MAXSIZE = 256
+
+
+def _generate_explanation(prompt):
+    response = GEMINI_MODEL.generate_content(prompt)
+    return getattr(response, 'text', str(response))
+
+
+def enqueue_explanation(prompt):
+    """Submit a Gemini explanation job. Returns a job id for polling."""
+    if len(EXPLANATION_JOBS) >= EXPLANATION_JOBS_MAXSIZE:
+        for finished in [jid for jid, fut in EXPLANATION_JOBS.items() if fut.done()]:
+            EXPLANATION_JOBS.pop(finished, None)
+    job_id = str(uuid.uuid4())
+    EXPLANATION_JOBS[job_id] = EXPLANATION_EXECUTOR.submit(_generate_explanation, prompt)
+    return job_id
+
+
+MAX_LOOKBACK_DAYS = 365 * 5
+
+
+@lru_cache(maxsize=128)
+def _parse_date(date_str):
+    """Parse YYYY-MM-DD; cached because front-ends resend the same dates repeatedly."""
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def validate_dates(date_from, date_to):
+    """Validate and clamp the requested date window. Returns (date_from, date_to) or None."""
+    try:
+        date_from_obj = _parse_date(date_from)
+        date_to_obj = _parse_date(date_to)
+        today = date.today()
+
+        if date_to_obj > today:
+            print(f"INFO: End date {date_to} is in the future, adjusting to today ({today})")
+            date_to_obj = today
+            date_to = today.strftime("%Y-%m-%d")
+
+        if date_from_obj > today:
+            print(f"INFO: Start date {date_from} is in the future, adjusting to 30 days ago")
+            date_from_obj = today - timedelta(days=30)
+            date_from = date_from_obj.strftime("%Y-%m-%d")
+
+        if date_from_obj > date_to_obj:
+            print("INFO: Start date after end date, swapping them")
+            date_from_obj, date_to_obj = date_to_obj, date_from_obj
+            date_from, date_to = date_to, date_from
+
+        max_lookback = today - timedelta(days=MAX_LOOKBACK_DAYS)
+        if date_from_obj < max_lookback:
+            print("INFO: Start date too far back, limiting to 5 years ago")
+            date_from_obj = max_lookback
+            date_from = date_from_obj.strftime("%Y-%m-%d")
+
+        print(f"Using dates: {date_from} to {date_to}")
+        return date_from, date_to
+    except ValueError as ve:
+        print(f"ERROR: Invalid date format: {ve}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def compute_indicators(prices_bytes, n):
+    """Indicator set for a float64 price buffer, cached on the raw bytes.
+
+    Dashboards re-requesting the same ticker hit this instead of re-running
+    the engine. Returns (vol, sma, ema, rsi, support_level, resistance_level).
+    """
+    prices = np.frombuffer(prices_bytes, dtype=np.float64, count=n)
+    indicators = compute_all(prices, alpha=0.1)
+    supports = indicators["supports"]
+    resistances = indicators["resistances"]
+    return (
+        indicators["volatility"],
+        indicators["sma"],
+        indicators["ema"],
+        indicators["rsi"],
+        float(supports.min()) if len(supports) > 0 else float(prices.min()),
+        float(resistances.max()) if len(resistances) > 0 else float(prices.max()),
+    )
+
+
 def analyze_stock(stock_symbol, date_from, date_to):
     """Analyze stock using Python engine and yfinance"""
     try:
         print(f"=== Starting analysis for {stock_symbol} from {date_from} to {date_to} ===")
 
-        # Validate and adjust dates
-        try:
-            date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date()
-            date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date()
-            today = date.today()
-
-            if date_to_obj > today:
-                print(f"INFO: End date {date_to} is in the future, adjusting to today ({today})")
-                date_to_obj = today
-                date_to = today.strftime("%Y-%m-%d")
-
-            if date_from_obj > today:
-                print(f"INFO: Start date {date_from} is in the future, adjusting to 30 days ago")
-                date_from_obj = today - timedelta(days=30)
-                date_from = date_from_obj.strftime("%Y-%m-%d")
-
-            if date_from_obj > date_to_obj:
-                print("INFO: Start date after end date, swapping them")
-                date_from_obj, date_to_obj = date_to_obj, date_from_obj
-                date_from, date_to = date_to, date_from
-
-            max_lookback = today - timedelta(days=365*5)
-            if date_from_obj < max_lookback:
-                print("INFO: Start date too far back, limiting to 5 years ago")
-                date_from_obj = max_lookback
-                date_from = date_from_obj.strftime("%Y-%m-%d")
-
-            print(f"Using dates: {date_from} to {date_to}")
-        except ValueError as ve:
-            print(f"ERROR: Invalid date format: {ve}")
+        validated = validate_dates(date_from, date_to)
+        if validated is None:
             return None
-
-        # Download data safely
-        def fetch_data(symbol):
-            try:
-                data = yf.download(symbol, start=date_from, end=date_to, progress=False, threads=False)
-                if data.empty and symbol.endswith('.NS'):
-                    alt_symbol = symbol.replace('.NS', '')
-                    print(f"Retrying with symbol: {alt_symbol}")
-                    data = yf.download(alt_symbol, start=date_from, end=date_to, progress=False, threads=False)
-                return data
-            except Exception as e:
-                print(f"ERROR downloading {symbol}: {e}")
-                return None
+        date_from, date_to = validated
 
         original_symbol = stock_symbol
         if '.' not in stock_symbol:
             stock_symbol = f"{stock_symbol}.NS"
 
-        data = fetch_data(stock_symbol)
+        data = fetch_price_data(stock_symbol, date_from, date_to)
         if data is None or data.empty:
-            data = fetch_data(original_symbol)
+            data = fetch_price_data(original_symbol, date_from, date_to)
         if data is None or data.empty:
             print(f"ERROR: No data available for {original_symbol}")
             return None
 
         print(f"Data downloaded successfully: {len(data)} rows")
+        return analyze_price_data(stock_symbol, data)
+
+    except Exception as e:
+        print(f"CRITICAL ERROR analyzing stock {stock_symbol}: {type(e).__name__}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def analyze_price_data(stock_symbol, data, include_ai=True):
+    """Run the indicator pipeline and AI explanation over an already-downloaded DataFrame."""
+    try:
+        original_symbol = stock_symbol
 
         # Extract Close prices safely
         if 'Close' in data.columns:
@@ -175,14 +416,9 @@ def analyze_stock(stock_symbol, date_from, date_to):
 
         print(f"Price data extracted: {len(prices)} points, range {prices.min():.2f} to {prices.max():.2f}")
 
-        # Technical indicators
-        vol = calculate_volatility(prices)
-        sma = calculate_sma(prices)
-        ema = calculate_ema(prices, alpha=0.1)
-        rsi = calculate_rsi(prices)
-        supports, resistances = find_support_resistance(prices)
-        support_level = supports.min() if len(supports) > 0 else prices.min()
-        resistance_level = resistances.max() if len(resistances) > 0 else prices.max()
+        # Technical indicators (cached on the price buffer for repeat requests)
+        vol, sma, ema, rsi, support_level, resistance_level = \
+            compute_indicators(prices.tobytes(), len(prices))
 
         # Signals
         trend = "bullish" if ema > 1.01 * sma else ("bearish" if ema < 0.99 * sma else "neutral")
@@ -192,11 +428,13 @@ def analyze_stock(stock_symbol, date_from, date_to):
         final_signal = "BUY" if trend == "bullish" and rsi < 60 and risk != "High Risk" else \
                       ("SELL" if trend == "bearish" and rsi > 40 else "HOLD")
 
-        # AI explanation
+        current_price_safe = prices[-1].item() if hasattr(prices[-1], "item") else float(prices[-1])
+
+        # AI explanation (dispatched asynchronously; clients poll /api/explanation)
         ai_explanation = None
-        if GEMINI_AVAILABLE and GEMINI_API_KEY:
+        explanation_job_id = None
+        if include_ai and GEMINI_MODEL is not None:
             try:
-                current_price_safe = prices[-1].item() if hasattr(prices[-1], "item") else float(prices[-1])
                 explanation_prompt = f"""Analyze this stock and provide a brief explanation:
 Stock Analysis Summary:
 - Current Price: ₹{round(current_price_safe,2)}
@@ -211,29 +449,35 @@ Stock Analysis Summary:
 - Risk: {risk}
 - Signal: {final_signal}"""
                 
-                model = genai.GenerativeModel("gemini-2.5-flash")
-                response = model.generate_content(explanation_prompt)
-                ai_explanation = getattr(response, 'text', str(response))
+                explanation_job_id = enqueue_explanation(explanation_prompt)
             except Exception as e:
                 print(f"Non-critical AI explanation error: {e}")
-                ai_explanation = None
+                explanation_job_id = None
 
         # Prepare OHLC chart data robustly
         window = min(90, len(prices))
-        chart_dates = [d.strftime("%Y-%m-%d") for d in data.index[-window:]]
-        chart_ohlc = []
-        for i in range(-window, 0):
-            o = data['Open'].iloc[i].item() if 'Open' in data.columns else prices[i].item()
-            h = data['High'].iloc[i].item() if 'High' in data.columns else prices[i].item()
-            l = data['Low'].iloc[i].item() if 'Low' in data.columns else prices[i].item()
-            c = data['Close'].iloc[i].item() if 'Close' in data.columns else prices[i].item()
-            chart_ohlc.append({
-                "x": chart_dates[i + window],
-                "o": round(o,2),
-                "h": round(h,2),
-                "l": round(l,2),
-                "c": round(c,2)
-            })
+        chart_dates = data.index[-window:].strftime("%Y-%m-%d").tolist()
+        tail = data.tail(window)
+
+        def _column_values(name):
+            if name in data.columns:
+                return tail[name].to_numpy(dtype=np.float64)
+            return prices[-window:]
+
+        ohlc_bars = np.stack([_column_values('Open'), _column_values('High'),
+                              _column_values('Low'), _column_values('Close')], axis=1)
+        # Fill NaN bars before the int cast - np.round(nan).astype(int32) yields
+        # INT_MIN sentinels that would wreck the chart scale client-side
+        if np.isnan(ohlc_bars).any():
+            ohlc_bars = pd.DataFrame(ohlc_bars).ffill().bfill().to_numpy()
+            ohlc_bars = np.nan_to_num(ohlc_bars)
+        # Pack bars as int32 cents; far smaller on the wire than per-field JSON
+        ohlc_cents = np.round(ohlc_bars * 100).astype(np.int32)
+        chart_payload = {
+            "dates": chart_dates,
+            "ohlc_cents": base64.b64encode(ohlc_cents.tobytes()).decode('ascii'),
+            "shape": [len(chart_dates), 4],
+        }
 
         return {
             "volatility": round(float(vol), 2),
@@ -249,10 +493,8 @@ Stock Analysis Summary:
             "signal": final_signal,
             "current_price": round(current_price_safe,2),
             "ai_explanation": ai_explanation,
-            "chart": {
-                "dates": chart_dates,
-                "ohlc": chart_ohlc
-            }
+            "explanation_job_id": explanation_job_id,
+            "chart": chart_payload
         }
 
     except Exception as e:
@@ -268,12 +510,18 @@ def home():
 
 @app.route('/health')
 def health():
-    return jsonify({
+    return ojsonify({
         "status": "ok",
         "firebase": FIREBASE_AVAILABLE and db is not None,
         "gemini": GEMINI_AVAILABLE and GEMINI_API_KEY is not None
     }), 200
 
+@app.route('/api/cache_clear', methods=['POST'])
+def api_cache_clear():
+    cleared = len(YF_CACHE)
+    YF_CACHE.clear()
+    return ojsonify({"status": "ok", "cleared": cleared}), 200
+
 @app.route('/chat')
 def chat():
     return render_template('chat.html')
@@ -307,7 +555,7 @@ def api_analyze():
             date_to = request.args.get('date_to')
         
         if not stock_symbol or not date_from or not date_to:
-            return jsonify({"error": "Missing required parameters: stock, date_from, and date_to are required"}), 400
+            return ojsonify({"error": "Missing required parameters: stock, date_from, and date_to are required"}), 400
         
         print(f"=== API Analyze Request ===")
         print(f"Stock: {stock_symbol}, From: {date_from}, To: {date_to}")
@@ -323,38 +571,159 @@ def api_analyze():
             result = analyze_stock(original_symbol, date_from, date_to)
         
         if result is None:
-            return jsonify({"error": f"Failed to analyze stock '{original_symbol}'"}), 400
+            return ojsonify({"error": f"Failed to analyze stock '{original_symbol}'"}), 400
         
-        return jsonify(result)
+        return ojsonify(result)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return ojsonify({"error": f"Server error: {str(e)}"}), 500
+
+
+@app.route('/api/explanation/<job_id>')
+def api_explanation(job_id):
+    future = EXPLANATION_JOBS.get(job_id)
+    if future is None:
+        return ojsonify({"error": "Unknown explanation job id"}), 404
+    if not future.done():
+        return ojsonify({"status": "pending"}), 200
+    try:
+        return ojsonify({"status": "done", "explanation": future.result()})
+    except Exception as e:
+        print(f"Non-critical AI explanation error: {e}")
+        return ojsonify({"status": "error", "error": str(e)}), 200
+
+
+# Yahoo accepts up to 20 symbols per request URL
+YF_BATCH_CHUNK = 20
+
+# Stock summaries marshaled into a single Gemini prompt; returns diminish beyond ~10
+GEMINI_BATCH_SIZE = 10
+
+
+def batch_ai_explanations(results):
+    """Fill in ai_explanation for batch results, one Gemini call per GEMINI_BATCH_SIZE stocks."""
+    if GEMINI_MODEL is None:
+        return
+
+    pending = [(symbol, result) for symbol, result in results.items() if result is not None]
+    for i in range(0, len(pending), GEMINI_BATCH_SIZE):
+        chunk = pending[i:i + GEMINI_BATCH_SIZE]
+        rows = []
+        for symbol, result in chunk:
+            rows.append({
+                "symbol": symbol,
+                "current_price": result["current_price"],
+                "ema": result["ema"],
+                "sma": result["sma"],
+                "rsi": result["rsi"],
+                "volatility_percent": result["volatility_percent"],
+                "support": result["support"],
+                "resistance": result["resistance"],
+                "trend": result["trend"],
+                "momentum": result["momentum"],
+                "risk": result["risk"],
+                "signal": result["signal"],
+            })
+
+        prompt = ("For each stock summarized in the JSON rows below, write a brief "
+                  "3-sentence analysis. Return a JSON array of objects with keys "
+                  '"symbol" and "explanation".\n' + json.dumps(rows))
+        try:
+            response = GEMINI_MODEL.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            parsed = json.loads(getattr(response, 'text', '') or '[]')
+            by_symbol = {row.get("symbol"): row.get("explanation")
+                         for row in parsed if isinstance(row, dict)}
+            for symbol, result in chunk:
+                result["ai_explanation"] = by_symbol.get(symbol)
+        except Exception as e:
+            print(f"Non-critical batch AI explanation error: {e}")
+
+
+@app.route('/api/analyze_batch', methods=['POST'])
+def api_analyze_batch():
+    try:
+        payload = request.get_json() or {}
+        symbols = payload.get('symbols') or []
+        date_from = payload.get('date_from')
+        date_to = payload.get('date_to')
+
+        if not symbols or not date_from or not date_to:
+            return ojsonify({"error": "Missing required parameters: symbols, date_from, and date_to are required"}), 400
+
+        validated = validate_dates(date_from, date_to)
+        if validated is None:
+            return ojsonify({"error": "Invalid date format, expected YYYY-MM-DD"}), 400
+        date_from, date_to = validated
+
+        symbols = [s if '.' in s else f"{s}.NS" for s in symbols]
+        print(f"=== API Batch Analyze Request: {len(symbols)} symbols ===")
+
+        frames = {}
+        for i in range(0, len(symbols), YF_BATCH_CHUNK):
+            chunk = symbols[i:i + YF_BATCH_CHUNK]
+            try:
+                data = yf.download(" ".join(chunk), start=date_from, end=date_to,
+                                   group_by='ticker', threads=True, progress=False)
+            except Exception as e:
+                print(f"ERROR downloading batch {chunk}: {e}")
+                data = None
+
+            for symbol in chunk:
+                symbol_data = None
+                if data is not None and not data.empty:
+                    if isinstance(data.columns, pd.MultiIndex):
+                        if symbol in data.columns.get_level_values(0):
+                            symbol_data = data[symbol].dropna(how='all')
+                    else:
+                        # Single-symbol chunks come back with flat columns
+                        symbol_data = data
+                frames[symbol] = symbol_data
+
+        def _analyze_one(symbol):
+            symbol_data = frames.get(symbol)
+            if symbol_data is None or symbol_data.empty:
+                print(f"ERROR: No data available for {symbol}")
+                return None
+            return analyze_price_data(symbol, symbol_data, include_ai=False)
+
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            results = dict(zip(symbols, ex.map(_analyze_one, symbols)))
+
+        batch_ai_explanations(results)
+        return ojsonify({"results": results})
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+        return ojsonify({"error": f"Server error: {str(e)}"}), 500
 
 
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
-    if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
-        return jsonify({"error": "AI chat is not available. Gemini AI is not configured."}), 503
+    if GEMINI_MODEL is None:
+        return ojsonify({"error": "AI chat is not available. Gemini AI is not configured."}), 503
     
     data = request.get_json()
     message = data.get('message', '')
     if not message:
-        return jsonify({"error": "Message is required"}), 400
+        return ojsonify({"error": "Message is required"}), 400
     
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(message)
+        response = GEMINI_MODEL.generate_content(message)
         response_text = response.text
         if not response_text:
-            return jsonify({"error": "Empty response from AI model"}), 500
-        return jsonify({"response": response_text})
+            return ojsonify({"error": "Empty response from AI model"}), 500
+        return ojsonify({"response": response_text})
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Error generating response: {str(e)}"}), 500
+        return ojsonify({"error": f"Error generating response: {str(e)}"}), 500
 
 
 if __name__ == "__main__":
+    # Local development only - production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.environ.get('PORT', 5001))
-    app.run(debug=True, host='0.0.0.0', port=port)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=port)
@@ -3,24 +3,50 @@ Python implementation of trading engine functions.
 Replaces the C++ engine for compatibility with cloud hosting platforms like Render.
 """
 import numpy as np
-import math
+
+# Numba JIT (optional) - falls back to pure Python if numba is not installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit when numba is unavailable."""
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+def _ensure_f64c(prices):
+    """Coerce to a contiguous 1-D float64 array. No copy if already in that form."""
+    return np.ascontiguousarray(np.asarray(prices, dtype=np.float64).ravel())
+
+
+@njit(cache=True, fastmath=True)
+def _ema_loop(prices, alpha):
+    """EMA recurrence over a contiguous float64 array. JIT-compiled when numba is available."""
+    ema = prices[0]
+    for i in range(1, len(prices)):
+        ema = alpha * prices[i] + (1 - alpha) * ema
+    return ema
 
 
 def calculate_volatility(prices):
     if len(prices) == 0:
         return 0.0
 
-    prices_array = np.asarray(prices, dtype=np.float64).flatten()
-    mean = float(np.mean(prices_array))
-    variance = float(np.mean((prices_array - mean) ** 2))
-    return float(math.sqrt(variance))
+    prices_array = _ensure_f64c(prices)
+    return float(np.std(prices_array))
 
 
 def calculate_sma(prices):
     if len(prices) == 0:
         return 0.0
 
-    prices_array = np.asarray(prices, dtype=np.float64).flatten()
+    prices_array = _ensure_f64c(prices)
     return float(np.mean(prices_array))
 
 
@@ -28,26 +54,18 @@ def calculate_ema(prices, alpha=0.1):
     if len(prices) == 0:
         return 0.0
 
-    prices_array = np.asarray(prices, dtype=np.float64).flatten()
-    ema = float(prices_array[0])
-    for i in range(1, len(prices_array)):
-        ema = alpha * prices_array[i] + (1 - alpha) * ema
-    return float(ema)
+    prices_array = _ensure_f64c(prices)
+    return float(_ema_loop(prices_array, alpha))
 
 
 def calculate_rsi(prices):
     if len(prices) < 2:
         return 50.0
 
-    prices_array = np.asarray(prices, dtype=np.float64).flatten()
-    gain = 0.0
-    loss = 0.0
-    for i in range(1, len(prices_array)):
-        diff = prices_array[i] - prices_array[i - 1]
-        if diff > 0:
-            gain += diff
-        else:
-            loss -= diff
+    prices_array = _ensure_f64c(prices)
+    diffs = np.diff(prices_array)
+    gain = float(np.maximum(diffs, 0.0).sum())
+    loss = float(-np.minimum(diffs, 0.0).sum())
     if loss == 0:
         return 100.0
     rs = gain / loss
@@ -58,14 +76,103 @@ def find_support_resistance(prices):
     if len(prices) < 3:
         return np.array([]), np.array([])
 
-    prices_array = np.asarray(prices, dtype=np.float64).flatten()
-    supports = []
-    resistances = []
+    prices_array = _ensure_f64c(prices)
+    mid = prices_array[1:-1]
+    left = prices_array[:-2]
+    right = prices_array[2:]
+    support_mask = (mid < left) & (mid < right)
+    resistance_mask = (mid > left) & (mid > right)
+
+    return mid[support_mask].copy(), mid[resistance_mask].copy()
 
-    for i in range(1, len(prices_array) - 1):
-        if prices_array[i] < prices_array[i - 1] and prices_array[i] < prices_array[i + 1]:
-            supports.append(prices_array[i])
-        if prices_array[i] > prices_array[i - 1] and prices_array[i] > prices_array[i + 1]:
-            resistances.append(prices_array[i])
 
-    return np.array(supports, dtype=np.float64), np.array(resistances, dtype=np.float64)
+@njit(cache=True, fastmath=True)
+def _fused_indicators(prices, alpha):
+    """Single pass over prices: mean, variance, EMA, RSI sums and pivots together."""
+    n = prices.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    ema = prices[0]
+    gain = 0.0
+    loss = 0.0
+    # Strict pivots cannot occur at adjacent indices, so n//2 slots suffice
+    supports = np.empty(n // 2 + 1, dtype=np.float64)
+    resistances = np.empty(n // 2 + 1, dtype=np.float64)
+    num_supports = 0
+    num_resistances = 0
+
+    for i in range(n):
+        p = prices[i]
+        total += p
+        total_sq += p * p
+        if i >= 1:
+            ema = alpha * p + (1 - alpha) * ema
+            diff = p - prices[i - 1]
+            if diff > 0:
+                gain += diff
+            else:
+                loss -= diff
+            if i < n - 1:
+                if p < prices[i - 1] and p < prices[i + 1]:
+                    supports[num_supports] = p
+                    num_supports += 1
+                if p > prices[i - 1] and p > prices[i + 1]:
+                    resistances[num_resistances] = p
+                    num_resistances += 1
+
+    mean = total / n
+    variance = total_sq / n - mean * mean
+    if variance < 0.0:
+        variance = 0.0
+
+    if n < 2:
+        rsi = 50.0
+    elif loss == 0.0:
+        rsi = 100.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    # copy() so callers don't keep the oversized scratch buffers alive
+    return (variance ** 0.5, mean, ema, rsi,
+            supports[:num_supports].copy(), resistances[:num_resistances].copy())
+
+
+def compute_all(prices, alpha=0.1):
+    """Compute every indicator off one shared coercion of the prices array.
+
+    With numba installed the whole set is fused into a single pass over the
+    array; otherwise each vectorized indicator runs separately.
+
+    Returns a dict with volatility, sma, ema, rsi, supports and resistances.
+    """
+    prices_array = _ensure_f64c(prices)
+    if len(prices_array) == 0:
+        return {
+            "volatility": 0.0,
+            "sma": 0.0,
+            "ema": 0.0,
+            "rsi": 50.0,
+            "supports": np.array([]),
+            "resistances": np.array([]),
+        }
+
+    if NUMBA_AVAILABLE:
+        vol, sma, ema, rsi, supports, resistances = _fused_indicators(prices_array, alpha)
+        return {
+            "volatility": float(vol),
+            "sma": float(sma),
+            "ema": float(ema),
+            "rsi": float(rsi),
+            "supports": supports,
+            "resistances": resistances,
+        }
+
+    supports, resistances = find_support_resistance(prices_array)
+    return {
+        "volatility": calculate_volatility(prices_array),
+        "sma": calculate_sma(prices_array),
+        "ema": calculate_ema(prices_array, alpha=alpha),
+        "rsi": calculate_rsi(prices_array),
+        "supports": supports,
+        "resistances": resistances,
+    }